@@ -96,10 +96,10 @@ def evaluate_predictions(dets, gts, methods, valid_classes, output):
         assert False
 
     coco_metrics = ["class", "AP", "total positives", "TP", "FP"]
-    coco_detail = pd.DataFrame([], columns=coco_metrics)
-    coco_summary = None
+    coco_detail = []
+    coco_summary = []
     voc_metrics = ["class", "AP", "total positives", "total TP", "total FP", "iou"]
-    voc_summary = pd.DataFrame([], columns=voc_metrics)
+    voc_summary = []
     for method in methods:
         dir_dets = f"{output}/dets/{method}"
         dets_method = dets[dets["method"] == method].copy().reset_index(drop=True)
@@ -127,12 +127,9 @@ def evaluate_predictions(dets, gts, methods, valid_classes, output):
         coco_res1 = coco_evaluator.get_coco_summary(gt_bbs, det_bbs)
         coco_res2 = coco_evaluator.get_coco_metrics(gt_bbs, det_bbs)
 
-        if coco_summary is None:
-            coco_summary = pd.DataFrame([], columns=coco_res1.keys())
-
         if coco_res1 is not None:
             coco_res1["method"] = method
-            coco_summary = coco_summary.append(coco_res1, ignore_index=True)
+            coco_summary.append(coco_res1)
 
         if coco_res2 is not None:
             for label in coco_res2.keys():
@@ -150,7 +147,7 @@ def evaluate_predictions(dets, gts, methods, valid_classes, output):
 
                 coco_values["recall"] = recall
                 coco_values["precision"] = precision
-                coco_detail = coco_detail.append(coco_values, ignore_index=True)
+                coco_detail.append(coco_values)
 
         #############################################################
         # EVALUATE WITH VOC PASCAL METRICS
@@ -181,10 +178,18 @@ def evaluate_predictions(dets, gts, methods, valid_classes, output):
                 voc_class_values["precision"] = voc_res[label]["table"][
                     "precision"
                 ].mean()
-                voc_summary = voc_summary.append(voc_class_values, ignore_index=True)
+                voc_summary.append(voc_class_values)
 
             # import pdb; pdb.set_trace()
 
+    # Build each DataFrame once instead of copying it on every appended row.
+    coco_summary = pd.DataFrame(coco_summary)
+    coco_detail = pd.DataFrame(
+        coco_detail, columns=coco_metrics + ["method", "recall", "precision"]
+    )
+    voc_summary = pd.DataFrame(
+        voc_summary, columns=voc_metrics + ["method", "recall", "precision"]
+    )
     return coco_summary, coco_detail, voc_summary
 
 
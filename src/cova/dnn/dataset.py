@@ -7,9 +7,12 @@ import io
 import json
 import logging
 import os
-from collections import namedtuple
+import struct
+from collections import deque, namedtuple
+from concurrent.futures import Executor, ThreadPoolExecutor
+from functools import partial
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterable, Iterator, Optional
 
 import cv2
 import numpy as np
@@ -36,6 +39,30 @@ except ImportError:
 
 from cova.dnn.tools import label_to_id_map
 
+# Columns (and their types) used from the detections csv to generate TFRecords.
+DETECTION_COLUMNS = {
+    "filename": "string",
+    "class": "string",
+    "xmin": "float32",
+    "xmax": "float32",
+    "ymin": "float32",
+    "ymax": "float32",
+}
+
+
+def _read_detections(csv_input: str) -> pd.DataFrame:
+    """Read only the columns required to generate TFRecords from a csv with detections.
+
+    Args:
+        csv_input (str): Path to the csv file with detections.
+
+    Returns:
+        DataFrame: DataFrame with the detections.
+    """
+    return pd.read_csv(
+        csv_input, usecols=list(DETECTION_COLUMNS), dtype=DETECTION_COLUMNS
+    )
+
 
 def _split_by_filename(df: pd.DataFrame):
     """Split detections in DataFrame by filename.
@@ -44,50 +71,114 @@ def _split_by_filename(df: pd.DataFrame):
         df (DataFrame): DataFrame with detections
 
     Returns:
-        list: TODO
+        list: (filename, object) namedtuples, with object holding the detections of filename.
     """
     data = namedtuple("data", ["filename", "object"])
-    gb = df.groupby("filename")
     return [
-        data(filename, gb.get_group(x))
-        for filename, x in zip(gb.groups.keys(), gb.groups)
+        data(filename, group) for filename, group in df.groupby("filename", sort=False)
     ]
 
 
+def _get_image_size(encoded_img: bytes) -> tuple[int, int]:
+    """Get the size of an encoded image.
+
+    For JPEG images, the size is read from the SOF marker in the header. Other formats fall back to PIL.
+
+    Args:
+        encoded_img (bytes): Encoded image.
+
+    Returns:
+        tuple: width and height of the image.
+    """
+    if encoded_img[:2] == b"\xff\xd8":
+        offset = 2
+        while offset + 9 <= len(encoded_img) and encoded_img[offset] == 0xFF:
+            marker = encoded_img[offset + 1]
+            # Markers can be preceded by any number of 0xFF fill bytes.
+            if marker == 0xFF:
+                offset += 1
+                continue
+
+            # SOF0-SOF15, except DHT (0xC4), JPG (0xC8) and DAC (0xCC).
+            if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+                height, width = struct.unpack(
+                    ">HH", encoded_img[offset + 5 : offset + 9]
+                )
+                return width, height
+
+            (length,) = struct.unpack(">H", encoded_img[offset + 2 : offset + 4])
+            offset += 2 + length
+
+    image = Image.open(io.BytesIO(encoded_img))
+    return image.size
+
+
+def _map_bounded(
+    executor: Executor, fn: Callable, iterable: Iterable, max_pending: int
+) -> Iterator:
+    """Like executor.map, but submits at most max_pending tasks ahead of the consumer.
+
+    Args:
+        executor (Executor): Executor running the tasks.
+        fn (Callable): Function to apply to each item.
+        iterable (Iterable): Items to apply fn to.
+        max_pending (int): Maximum number of submitted tasks whose result was not yielded yet.
+
+    Yields:
+        Results of fn, in the same order as the items in iterable.
+    """
+    pending = deque()
+    for item in iterable:
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+        pending.append(executor.submit(fn, item))
+
+    while pending:
+        yield pending.popleft().result()
+
+
+def _encode_classes(classes: pd.Series, id_map: dict) -> tuple[list, list]:
+    """Encode class names and map them to their ids.
+
+    Each distinct class is encoded and looked up once, then expanded back to one entry per row.
+
+    Args:
+        classes (Series): Class name of each detection.
+        id_map (dict): Map from class name to class id.
+
+    Raises:
+        ValueError: If any detection has no class.
+        KeyError: If a class is not in id_map.
+
+    Returns:
+        tuple: UTF-8 encoded class names and class ids, one per detection.
+    """
+    class_codes, unique_classes = pd.factorize(classes)
+    # factorize marks missing values with -1, which would index the last class.
+    if (class_codes < 0).any():
+        raise ValueError("Detections with missing class.")
+
+    unique_text = np.array([c.encode("utf8") for c in unique_classes], dtype=object)
+    unique_ids = np.array([id_map[c] for c in unique_classes], dtype=np.int64)
+    return unique_text[class_codes].tolist(), unique_ids[class_codes].tolist()
+
+
 def create_tf_example(group, path, id_map):
     with tf.gfile.GFile(os.path.join(path, "{}".format(group.filename)), "rb") as fid:
         encoded_jpg = fid.read()
-    encoded_jpg_io = io.BytesIO(encoded_jpg)
-    image = Image.open(encoded_jpg_io)
-    width, height = image.size
+    width, height = _get_image_size(encoded_jpg)
 
     filename = group.filename.encode("utf8")
     image_format = b"jpg"
-    xmins = []
-    xmaxs = []
-    ymins = []
-    ymaxs = []
-    classes_text = []
-    classes = []
-
-    for index, row in group.object.iterrows():
-        xmins.append((row["xmin"] / width))
-        xmaxs.append((row["xmax"] / width))
-        ymins.append((row["ymin"] / height))
-        ymaxs.append((row["ymax"] / height))
-        classes_text.append(row["class"].encode("utf8"))
-        classes.append(id_map[row["class"]])
-
-    if max(xmins + xmaxs + ymins + ymaxs) > 1.1:
-        import pdb
-
-        pdb.set_trace()
-    if min(xmins + xmaxs + ymins + ymaxs) < 0.0:
-        import pdb
-
-        pdb.set_trace()
-    assert max(xmins + xmaxs + ymins + ymaxs) <= 1.1
-    assert min(xmins + xmaxs + ymins + ymaxs) >= 0.0
+    xmins = group.object["xmin"].to_numpy() / width
+    xmaxs = group.object["xmax"].to_numpy() / width
+    ymins = group.object["ymin"].to_numpy() / height
+    ymaxs = group.object["ymax"].to_numpy() / height
+
+    classes_text, classes = _encode_classes(group.object["class"], id_map)
+
+    coords = np.concatenate([xmins, xmaxs, ymins, ymaxs])
+    assert coords.min() >= 0.0 and coords.max() <= 1.1
 
     tf_example = tf.train.Example(
         features=tf.train.Features(
@@ -98,10 +189,18 @@ def create_tf_example(group, path, id_map):
                 "image/source_id": dataset_util.bytes_feature(filename),
                 "image/encoded": dataset_util.bytes_feature(encoded_jpg),
                 "image/format": dataset_util.bytes_feature(image_format),
-                "image/object/bbox/xmin": dataset_util.float_list_feature(xmins),
-                "image/object/bbox/xmax": dataset_util.float_list_feature(xmaxs),
-                "image/object/bbox/ymin": dataset_util.float_list_feature(ymins),
-                "image/object/bbox/ymax": dataset_util.float_list_feature(ymaxs),
+                "image/object/bbox/xmin": dataset_util.float_list_feature(
+                    xmins.tolist()
+                ),
+                "image/object/bbox/xmax": dataset_util.float_list_feature(
+                    xmaxs.tolist()
+                ),
+                "image/object/bbox/ymin": dataset_util.float_list_feature(
+                    ymins.tolist()
+                ),
+                "image/object/bbox/ymax": dataset_util.float_list_feature(
+                    ymaxs.tolist()
+                ),
                 "image/object/class/text": dataset_util.bytes_list_feature(
                     classes_text
                 ),
@@ -113,7 +212,11 @@ def create_tf_example(group, path, id_map):
 
 
 def generate_tfrecord(
-    output_path: str, images_dir: str, csv_input: str, label_map: dict
+    output_path: str,
+    images_dir: str,
+    csv_input: str,
+    label_map: dict,
+    max_workers: int = 8,
 ):
     """Generate TFRecord dataset with images from the images_dir and detections from the input csv.
 
@@ -122,16 +225,21 @@ def generate_tfrecord(
         images_dir (str): Path to the directory that contains the images to write into the TFRecord file.
         csv_input (str): Path to the csv files with the detections to write into the TFRecord file.
         label_map (dict): label_map with pbtxt format. Defaults to None.
+        max_workers (int, optional): Number of threads reading images in parallel. Defaults to 8.
     """
 
     writer = tf.python_io.TFRecordWriter(output_path)
     path = os.path.join(images_dir)
-    examples = pd.read_csv(csv_input)
+    examples = _read_detections(csv_input)
     grouped = _split_by_filename(examples)
     id_map = label_to_id_map(label_map)
-    for group in grouped:
-        tf_example = create_tf_example(group, path, id_map)
-        writer.write(tf_example.SerializeToString())
+    # Images are read in parallel, but the writer is not thread-safe:
+    # examples are written from this thread, in order. Tasks in flight are bounded
+    # so examples (and their images) do not pile up ahead of the writer.
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        create_fn = partial(create_tf_example, path=path, id_map=id_map)
+        for tf_example in _map_bounded(executor, create_fn, grouped, 2 * max_workers):
+            writer.write(tf_example.SerializeToString())
 
     writer.close()
     output_path = os.path.join(os.getcwd(), output_path)
@@ -143,6 +251,7 @@ def generate_joint_tfrecord(
     images_dirs: str,
     csv_inputs: list,
     label_map: Optional[dict] = None,
+    max_workers: int = 8,
 ):
     """Generate TFRecord dataset from a list of csv files with detections.
 
@@ -151,16 +260,20 @@ def generate_joint_tfrecord(
         images_dirs (list): List of paths to the directories that contain the images to write into the TFRecord file.
         csv_inputs (list): List of csv files with the detections to write into the TFRecord file.
         label_map (dict, optional): label_map with pbtxt format. Defaults to None.
+        max_workers (int, optional): Number of threads reading images in parallel. Defaults to 8.
     """
     writer = tf.python_io.TFRecordWriter(output_path)
     id_map = label_to_id_map(label_map)
-    for img_dir, csv in zip(images_dirs, csv_inputs):
-        examples = pd.read_csv(csv)
-        grouped = _split_by_filename(examples)
-        path = os.path.join(img_dir)
-        for group in grouped:
-            tf_example = create_tf_example(group, path, id_map)
-            writer.write(tf_example.SerializeToString())
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for img_dir, csv in zip(images_dirs, csv_inputs):
+            examples = _read_detections(csv)
+            grouped = _split_by_filename(examples)
+            path = os.path.join(img_dir)
+            create_fn = partial(create_tf_example, path=path, id_map=id_map)
+            for tf_example in _map_bounded(
+                executor, create_fn, grouped, 2 * max_workers
+            ):
+                writer.write(tf_example.SerializeToString())
 
     writer.close()
     output_path = os.path.join(os.getcwd(), output_path)
@@ -32,6 +32,13 @@ except ImportError:
 from cova.dnn.dataset import get_dataset_labels
 from cova.dnn.tools import load_model, load_pbtxt
 
+# Plugin configs that split the device into several streams, so that the plugin
+# creates (and runs in parallel) more than one infer request.
+THROUGHPUT_CONFIGS = {
+    "CPU": {"CPU_THROUGHPUT_STREAMS": "CPU_THROUGHPUT_AUTO"},
+    "GPU": {"GPU_THROUGHPUT_STREAMS": "GPU_THROUGHPUT_AUTO"},
+}
+
 
 class Model(ABC):
     """Abstract class for loading models."""
@@ -51,9 +58,10 @@ class ModelTF(Model):
         min_score: float = 0,
         iou_threshold: float = 0,
         label_map: Optional[str] = None,
+        mixed_precision: bool = False,
     ):
         """Loads TensorFlow model from model_dir and initializes parameters"""
-        self.detector = load_model(model_dir)
+        self.detector = load_model(model_dir, mixed_precision=mixed_precision)
         self.from_checkpoint = self.detector.from_checkpoint
 
         self.max_boxes = max_boxes
@@ -81,33 +89,41 @@ class ModelTF(Model):
             list: list with results, one per image in the batch. Results are dicts with ['boxes', scores', 'class_ids']
         """
         batch_size = len(batch)
-        batch_np = np.stack([img for img in batch], axis=0)
-
-        if self.from_checkpoint:
-            input_tensor = tf.cast(batch_np, dtype=tf.float32)
-        else:
-            input_tensor = tf.image.convert_image_dtype(batch_np, tf.uint8)
+        # Keep frames as uint8 on the host; checkpoint models cast them on the device.
+        input_tensor = tf.convert_to_tensor(np.stack(batch, axis=0), dtype=tf.uint8)
         results = self.detector.detect(input_tensor)
 
+        all_boxes = results["detection_boxes"]
+        all_scores = results["detection_scores"]
+        all_class_ids = results["detection_classes"]
+        num_detections = [len(scores) for scores in all_scores]
+
+        if self.nms:
+            # Run NMS over the whole batch in one op instead of once per image.
+            selected_indices, num_detections = tf.image.non_max_suppression_padded(
+                boxes=all_boxes,
+                scores=all_scores,
+                max_output_size=self.max_boxes,
+                iou_threshold=self.iou_threshold,
+                score_threshold=max(self.min_score, 0.05),
+                pad_to_max_output_size=True,
+            )
+
+            all_boxes = tf.gather(all_boxes, selected_indices, batch_dims=1).numpy()
+            all_scores = tf.gather(all_scores, selected_indices, batch_dims=1).numpy()
+            all_class_ids = tf.gather(
+                all_class_ids, selected_indices, batch_dims=1
+            ).numpy()
+            num_detections = num_detections.numpy()
+
         batch_results = []
 
         for batch_id in range(batch_size):
-            boxes = results["detection_boxes"][batch_id]
-            scores = results["detection_scores"][batch_id]
-            class_ids = results["detection_classes"][batch_id]
-
-            if self.nms:
-                selected_indices = tf.image.non_max_suppression(
-                    boxes=boxes,
-                    scores=scores,
-                    max_output_size=self.max_boxes,
-                    iou_threshold=self.iou_threshold,
-                    score_threshold=max(self.min_score, 0.05),
-                )
-
-                boxes = tf.gather(boxes, selected_indices).numpy()
-                scores = tf.gather(scores, selected_indices).numpy()
-                class_ids = tf.gather(class_ids, selected_indices).numpy()
+            # Padded NMS output is only valid up to the number of selected boxes.
+            valid = num_detections[batch_id]
+            boxes = all_boxes[batch_id][:valid]
+            scores = all_scores[batch_id][:valid]
+            class_ids = all_class_ids[batch_id][:valid]
 
             labels = []
             if self.label_map:
@@ -138,6 +154,8 @@ class ModelIE(Model):
         min_score: float = 0.0,
         iou_threshold: float = 0.0,
         label_map: Optional[str] = None,
+        num_requests: int = 0,
+        config: Optional[dict] = None,
     ):
         self.max_boxes = max_boxes
         self.nms = iou_threshold > 0
@@ -213,7 +231,17 @@ class ModelIE(Model):
             self.net.outputs["labels"].precision = "U16"
 
         logger.info("Loading the model to the plugin")
-        self.exec_net = self.ie.load_network(network=self.net, device_name=device)
+        # With the default single stream, the plugin's optimal number of requests is 1.
+        # Use throughput streams unless a config is given, and num_requests=0 to let
+        # the plugin pick as many parallel requests as streams.
+        if config is None:
+            config = THROUGHPUT_CONFIGS.get(device, {})
+        self.exec_net = self.ie.load_network(
+            network=self.net,
+            device_name=device,
+            config=config,
+            num_requests=num_requests,
+        )
 
         _, _, self.net_h, self.net_w = self.net.input_info[
             self.input_blob
@@ -231,23 +259,13 @@ class ModelIE(Model):
 
         2. The labels is a blob with the shape 100 in the format N, where N is the number of detected bounding boxes. It contains predicted class ID (0 - person) per each detected box.
         """
-        boxes = []
-        scores = []
-        class_ids = []
-        detections = results["boxes"]
-        detected_ids = results["labels"]
-        for detection, class_id in zip(detections, detected_ids):
-            if class_id < 0:
-                continue
-            xmin, ymin, xmax, ymax, score = detection
-
-            if score < min_score:
-                continue
-
-            boxes.append([xmin, ymin, xmax, ymax])
-            scores.append(score)
-            class_ids.append(class_id)
+        detections = np.asarray(results["boxes"]).reshape(-1, 5)
+        detected_ids = np.asarray(results["labels"]).reshape(-1)
+        valid = (detected_ids >= 0) & (detections[:, 4] >= min_score)
 
+        boxes = detections[valid, :4].tolist()
+        scores = detections[valid, 4].tolist()
+        class_ids = detected_ids[valid].tolist()
         return boxes, scores, class_ids
 
     @staticmethod
@@ -257,21 +275,12 @@ class ModelIE(Model):
     ) -> tuple[list, list, list]:
         # Change a shape of a numpy.ndarray with results ([1, 1, N, 7]) to get another one ([N, 7]),
         # where N is the number of detected bounding boxes
-        detections = results.reshape(-1, 7).tolist()
-
-        boxes = []
-        scores = []
-        class_ids = []
-        for detection in detections:
-            _, class_id, score, xmin, ymin, xmax, ymax = detection
-
-            if score < min_score:
-                continue
-
-            boxes.append([xmin, ymin, xmax, ymax])
-            scores.append(score)
-            class_ids.append(class_id)
+        detections = results.reshape(-1, 7)
+        detections = detections[detections[:, 2] >= min_score]
 
+        boxes = detections[:, 3:7].tolist()
+        scores = detections[:, 2].tolist()
+        class_ids = detections[:, 1].tolist()
         return boxes, scores, class_ids
 
     def decode_results(self, results: dict) -> tuple[list, list, list, list]:
@@ -305,28 +314,43 @@ class ModelIE(Model):
         Returns:
             list: list with results, one per image in the batch. Results are dicts with ['boxes', scores', 'class_ids']
         """
-        batch_results = []
-        for img in batch:
+        batch_size = len(batch)
+        batch_np = np.empty((batch_size, 3, self.net_h, self.net_w), dtype=np.uint8)
+        for batch_id, img in enumerate(batch):
             if img.shape[:-1] != (self.net_h, self.net_w):
                 img = cv2.resize(img, (self.net_w, self.net_h))
 
             # Change data layout from HWC to CHW
-            img = img.transpose((2, 0, 1))
-            # Add N dimension to transform to NCHW
-            img = np.expand_dims(img, axis=0)
-
-            logger.info("Starting inference in synchronous mode")
-            results = self.exec_net.infer(inputs={self.input_blob: img})
+            batch_np[batch_id] = img.transpose((2, 0, 1))
 
-            boxes, scores, class_ids, labels = self.decode_results(results)
+        logger.debug("Starting inference of %d images in asynchronous mode", batch_size)
+        requests = self.exec_net.requests
+        batch_results = []
+        for start in range(0, batch_size, len(requests)):
+            end = min(start + len(requests), batch_size)
+            # Keep all infer requests busy at once instead of waiting on each image.
+            for request_id, batch_id in enumerate(range(start, end)):
+                self.exec_net.start_async(
+                    request_id=request_id,
+                    inputs={self.input_blob: batch_np[batch_id : batch_id + 1]},
+                )
 
-            batch_results.append(
-                {
-                    "boxes": boxes,
-                    "scores": scores,
-                    "class_ids": class_ids,
-                    "labels": labels,
+            for request_id in range(end - start):
+                requests[request_id].wait(-1)
+                results = {
+                    name: blob.buffer
+                    for name, blob in requests[request_id].output_blobs.items()
                 }
-            )
+
+                boxes, scores, class_ids, labels = self.decode_results(results)
+
+                batch_results.append(
+                    {
+                        "boxes": boxes,
+                        "scores": scores,
+                        "class_ids": class_ids,
+                        "labels": labels,
+                    }
+                )
 
         return batch_results
@@ -1,3 +1,4 @@
+import ast
 import importlib.util
 import inspect
 import logging
@@ -17,30 +18,54 @@ CONSTRUCTORS = ["COVACapture", "COVAFilter", "COVAAnnotate", "COVADataset", "COV
 
 
 class COVAFactory:
-    """Factory class to load and get COVA plugins."""
+    """Factory class to load and get COVA plugins.
+
+    Plugin files are only indexed when registered. A plugin module is imported
+    when it is requested, so dependencies of unused plugins are never loaded.
+    """
 
     def __init__(self):
         self._plugins_by_class = {}
         self._plugins_by_module = {}
+        self._modules = {}
 
         current_dir = os.path.dirname(os.path.abspath(__file__))
         plugins_dir = os.path.join(current_dir, "plugins")
         self.load_plugins(plugins_dir)
 
     @staticmethod
-    def _detect_class(module) -> Optional[tuple[Callable, str]]:
-        """Detects the class the plugin implements and returns its constructor and its parent class."""
-        for member in inspect.getmembers(module, inspect.isclass):
-            # Has a COVA parent?
-            for mro in reversed(member[1].mro()[1:]):
-                if mro.__name__ in CONSTRUCTORS:
-                    return member[1]
+    def _is_plugin(cls) -> bool:
+        """Checks whether cls implements a COVA stage."""
+        return any(mro.__name__ in CONSTRUCTORS for mro in cls.mro()[1:])
+
+    @staticmethod
+    def _detect_class(module) -> Optional[Callable]:
+        """Detects the class the plugin implements and returns its constructor."""
+        for _, member in inspect.getmembers(module, inspect.isclass):
+            # Skip plugins imported from other modules (e.g. a parent plugin class).
+            if member.__module__ == module.__name__ and COVAFactory._is_plugin(member):
+                return member
 
         return None
 
     @staticmethod
-    def _load_plugin(plugin_file: str) -> tuple[Callable, str]:
-        """Loads a plugin from plugin_file containing the implementation of class_name class."""
+    def _scan_plugin(plugin_file: str) -> dict[str, list[str]]:
+        """Returns the classes in plugin_file with the names of their bases, without importing it."""
+        tree = ast.parse(Path(plugin_file).read_text(), filename=plugin_file)
+        return {
+            node.name: [
+                # Bases can be qualified, e.g. pipeline.COVAFilter.
+                base.attr if isinstance(base, ast.Attribute) else base.id
+                for base in node.bases
+                if isinstance(base, (ast.Name, ast.Attribute))
+            ]
+            for node in tree.body
+            if isinstance(node, ast.ClassDef)
+        }
+
+    @staticmethod
+    def _load_module(plugin_file: str):
+        """Imports the module in plugin_file."""
         module_name = Path(plugin_file).stem
         spec = importlib.util.spec_from_file_location(module_name, plugin_file)
         if spec is None:
@@ -56,15 +81,35 @@ class COVAFactory:
             raise ModuleNotFoundError(f"Could not load plugin from file {plugin_file}.")
 
         spec.loader.exec_module(module)
+        return module
+
+    def _load_plugin(
+        self, plugin_file: str, class_name: Optional[str] = None
+    ) -> tuple[Callable, str]:
+        """Loads a plugin from plugin_file containing the implementation of class_name class.
 
-        ret = COVAFactory._detect_class(module)
-        if ret is None:
+        If class_name is None, the first class implementing a COVA stage is used.
+        Each plugin file is imported once and reused by later calls.
+        """
+        module = self._modules.get(plugin_file, None)
+        if module is None:
+            module = COVAFactory._load_module(plugin_file)
+            self._modules[plugin_file] = module
+
+        if class_name is None:
+            constructor = COVAFactory._detect_class(module)
+        else:
+            constructor = getattr(module, class_name, None)
+            if not inspect.isclass(constructor) or not COVAFactory._is_plugin(
+                constructor
+            ):
+                constructor = None
+        if constructor is None:
             logger.error("Could not load plugin from module %s.", module.__name__)
             raise ModuleNotFoundError(
                 f"Could not load plugin from module {module.__name__}."
             )
 
-        constructor, _ = ret
         logger.info(
             "Loaded plugin %s from module %s.",
             constructor.__name__,
@@ -73,34 +118,54 @@ class COVAFactory:
         return constructor, module.__name__
 
     def load_plugins(self, plugins_path: str) -> None:
-        """Loads the plugins found in the plugins_path."""
+        """Registers the plugins found in the plugins_path. Plugins are loaded on get."""
         if os.path.isdir(plugins_path):
             plugins = [str(p) for p in Path(plugins_path).rglob("*.py")]
         else:
             plugins = [plugins_path]
 
+        classes_by_file = {}
         for plugin_file in plugins:
             try:
-                plugin, module_name = COVAFactory._load_plugin(plugin_file)
-            except ModuleNotFoundError:
+                classes_by_file[plugin_file] = COVAFactory._scan_plugin(plugin_file)
+            except (OSError, SyntaxError):
                 continue
+
+        # Plugins subclass a COVA stage, directly or through other plugins. Files come in
+        # any order, so propagate through the class hierarchy until no new plugin is found.
+        known = set(CONSTRUCTORS) | set(self._plugins_by_class)
+        plugins_by_file = {plugin_file: set() for plugin_file in classes_by_file}
+        found = True
+        while found:
+            found = False
+            for plugin_file, classes in classes_by_file.items():
+                for class_name, bases in classes.items():
+                    if class_name in plugins_by_file[plugin_file]:
+                        continue
+                    if known.intersection(bases):
+                        plugins_by_file[plugin_file].add(class_name)
+                        known.add(class_name)
+                        found = True
+
+        for plugin_file, classes in classes_by_file.items():
+            class_names = [c for c in classes if c in plugins_by_file[plugin_file]]
+            if not class_names:
+                continue
+
             # Check that no other plugin had the same name.
             conflict_by_class = False
-            try:
-                assert self._plugins_by_class.get(plugin.__name__, None) is None
-            except AttributeError:
-                continue
-            except AssertionError:
-                conflict_by_class = True
-                msg = (
-                    f"Conflict in plugins by class name: {plugin.__name__} is duplicated. "
-                    + "Previous will be shadowed."
-                )
-                logger.warning(msg)
+            for class_name in class_names:
+                if self._plugins_by_class.get(class_name, None) is not None:
+                    conflict_by_class = True
+                    msg = (
+                        f"Conflict in plugins by class name: {class_name} is duplicated. "
+                        + "Previous will be shadowed."
+                    )
+                    logger.warning(msg)
+                self._plugins_by_class[class_name] = plugin_file
 
-            try:
-                assert self._plugins_by_module.get(plugin.__name__, None) is None
-            except AssertionError:
+            module_name = Path(plugin_file).stem
+            if self._plugins_by_module.get(module_name, None) is not None:
                 msg = (
                     f"Conflict in plugins by module name: {module_name} is duplicated. "
                     + "Previous will be shadowed."
@@ -109,20 +174,24 @@ class COVAFactory:
                     logger.error(msg)
                 else:
                     logger.warning(msg)
-
-            self._plugins_by_class[plugin.__name__] = plugin
-            self._plugins_by_module[module_name] = plugin
+            self._plugins_by_module[module_name] = plugin_file
 
     def get(self, plugin_name: str, kwargs):
         """Returns objects of the class defined in plugin plugin_name."""
+        class_name: Optional[str] = plugin_name
+        plugin_file = self._plugins_by_class.get(plugin_name, None)
+        if plugin_file is None:
+            class_name = None
+            plugin_file = self._plugins_by_module.get(plugin_name, None)
+        if plugin_file is None:
+            logger.error("Plugin %s not available.", plugin_name)
+            sys.exit(1)
+
         try:
-            constructor_fn = self._plugins_by_class[plugin_name]
-        except KeyError:
-            try:
-                constructor_fn = self._plugins_by_module[plugin_name]
-            except KeyError:
-                logger.error("Plugin %s not available.", plugin_name)
-                sys.exit(1)
+            constructor_fn, _ = self._load_plugin(plugin_file, class_name)
+        except ModuleNotFoundError as e:
+            logger.error("Plugin %s could not be loaded: %s", plugin_name, e)
+            sys.exit(1)
 
         return constructor_fn(**kwargs)
 
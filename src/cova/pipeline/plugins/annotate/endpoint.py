@@ -1,6 +1,7 @@
 import base64
 import json
 import sys
+import threading
 import time
 from collections import namedtuple
 from concurrent.futures import ThreadPoolExecutor
@@ -35,6 +36,7 @@ class FlaskAnnotator(COVAAnnotate):
         num_reqs: Number of requests accepted. Used to give requests individual id's.
         url: Server's url.
         port: Port to connect to the server.
+        sessions: HTTP sessions reused by the requests to the server, one per thread.
     """
 
     pending: list[Request]
@@ -42,6 +44,7 @@ class FlaskAnnotator(COVAAnnotate):
     num_reqs: int
     url: str
     port: int
+    sessions: list[requests.Session]
 
     def __init__(self, url: str, port: int = 6000) -> None:
         """Init EdgeClient with url and port to connect to the server.
@@ -55,6 +58,26 @@ class FlaskAnnotator(COVAAnnotate):
         self.num_reqs = 0
         self.pending = []
         self.processed = []
+        # Keep connections alive across requests instead of reconnecting per image.
+        # Sessions are not guaranteed to be thread-safe, so each worker gets its own.
+        self.sessions = []
+        self._local = threading.local()
+
+    def _get_session(self) -> requests.Session:
+        """Returns the HTTP session of the calling thread, creating it on first use."""
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            self._local.session = session
+            self.sessions.append(session)
+        return session
+
+    def _close_sessions(self) -> None:
+        """Closes the HTTP sessions opened so far."""
+        for session in self.sessions:
+            session.close()
+        self.sessions = []
+        self._local = threading.local()
 
     @staticmethod
     def _process_response(response):
@@ -74,7 +97,7 @@ class FlaskAnnotator(COVAAnnotate):
 
         req_url = f"{self.url}:{self.port}/infer"
         try:
-            r = requests.post(
+            r = self._get_session().post(
                 req_url,
                 data={
                     "img": img64,
@@ -124,12 +147,16 @@ class FlaskAnnotator(COVAAnnotate):
         Yields:
             list: List with id of the request, 3D np.array with the image, and annotation results.
         """
-        with ThreadPoolExecutor(max_workers=max_workers) as executor:
-            results = executor.map(self.post_request, self.pending)
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                results = executor.map(self.post_request, self.pending)
 
-            for _, req in enumerate(results):
-                self.pending.remove(req)
-                yield req.id, req.img, req.results
+                for _, req in enumerate(results):
+                    self.pending.remove(req)
+                    yield req.id, req.img, req.results
+        finally:
+            # Worker threads (and their sessions) do not outlive the executor.
+            self._close_sessions()
 
     def epilogue(self):
         for id, img, results in self.process_pending():
@@ -137,3 +164,5 @@ class FlaskAnnotator(COVAAnnotate):
             print(img)
             print(results)
             break
+
+        self._close_sessions()
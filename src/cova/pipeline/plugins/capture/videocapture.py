@@ -1,17 +1,33 @@
 """This module implements a simple COVACapturer using OpenCV's VideoCapture class."""
 
+import os
+from queue import Queue
+from threading import Event, Thread
 from typing import Optional
 
 import cv2
 
 from cova.pipeline.pipeline import COVACapture
 
+# Decode with a single FFmpeg thread: the decoder thread already runs in parallel
+# with the rest of the pipeline, and extra FFmpeg threads only oversubscribe cores.
+os.environ.setdefault("OPENCV_FFMPEG_CAPTURE_OPTIONS", "threads;1")
+
 
 class VideoCapture(COVACapture):
-    """Class implementing decoding as a COVACapture pipeline stage using OpenCV"""
+    """Class implementing decoding as a COVACapture pipeline stage using OpenCV.
+
+    Frames are decoded by a background thread into a bounded queue, so decoding
+    overlaps with the filter and annotate stages consuming them.
+    """
 
     def __init__(
-        self, stream: str, frameskip: int = 0, resize: Optional[tuple[int, int]] = None
+        self,
+        stream: str,
+        frameskip: int = 0,
+        resize: Optional[tuple[int, int]] = None,
+        queue_size: int = 16,
+        hw_accel: bool = False,
     ):
         """Init VideoCapture with stream to capture from.
 
@@ -19,20 +35,69 @@ class VideoCapture(COVACapture):
             stream (str): Stream to capture from.
             frameskip (int): Number of frames to skip between captures.
             resize (Optional[tuple[int, int]]): Resize captured frames to this size.
+            queue_size (int): Maximum number of decoded frames waiting to be captured.
+            hw_accel (bool): Decode using any available hardware decoder (e.g. NVDEC, VA-API).
         """
-        self.cap = cv2.VideoCapture(stream)
+        if hw_accel:
+            self.cap = cv2.VideoCapture(
+                stream,
+                cv2.CAP_FFMPEG,
+                [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY],
+            )
+        else:
+            self.cap = cv2.VideoCapture(stream)
+        self.cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+        # Skips frameskip + 1 frames after each capture, as the seek-based version did.
         self.frameskip = frameskip + 1
         self.resize = resize
         assert self.cap.isOpened()
 
+        self.frames: Queue = Queue(maxsize=queue_size)
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.stopped = Event()
+        self.decoder = Thread(target=self._decode, daemon=True)
+        self.decoder.start()
+
+    def _decode(self) -> None:
+        """Decode frames from the stream until it ends or the capture is stopped."""
+        try:
+            ret = True
+            while ret and not self.stopped.is_set():
+                ret, frame = self.cap.read()
+                # Grab skipped frames instead of seeking: no retrieve/convert and no
+                # keyframe seek per capture.
+                for _ in range(self.frameskip):
+                    self.cap.grab()
+                if ret and self.resize:
+                    frame = cv2.resize(frame, self.resize)
+                if ret:
+                    self.frames.put((ret, frame))
+        except Exception as e:
+            # Raised again by capture() on the caller's thread.
+            self.error = e
+        finally:
+            # Always end with a terminal item so capture() never blocks on a dead thread.
+            self.frames.put((False, None))
+
     def capture(self) -> tuple[bool, Optional[bytes]]:
         """Capture next frame from stream."""
-        ret, frame = self.cap.read()
-        self.cap.set(1, self.cap.get(cv2.CAP_PROP_POS_FRAMES) + self.frameskip)
-        if ret and self.resize:
-            frame = cv2.resize(frame, self.resize)
+        if self.finished:
+            return False, None
+
+        ret, frame = self.frames.get()
+        self.finished = not ret
+        # Frames decoded before an error are delivered first; the error ends the stream.
+        if not ret and self.error is not None:
+            raise self.error
         return ret, frame
 
     def epilogue(self) -> None:
-        """Release VideoCapture."""
-        pass
+        """Stop decoding and release VideoCapture."""
+        self.stopped.set()
+        # Unblock the decoder while it waits on a full queue, including its final put.
+        while self.decoder.is_alive():
+            while not self.frames.empty():
+                self.frames.get_nowait()
+            self.decoder.join(timeout=0.1)
+        self.cap.release()
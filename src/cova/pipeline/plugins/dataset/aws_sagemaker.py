@@ -88,6 +88,21 @@ class AWSDataset(COVADataset):
         """Generates json manifest required to build TFRecord."""
         timestamp = datetime.now().isoformat(timespec="milliseconds")
         dataset_name = self.dataset_config["dataset_name"]
+        bucket = self.s3_config["bucket"]
+        images_prefix = self.s3_config["images_prefix"]
+        min_score = self.dataset_config["min_score"]
+        valid_classes = self.dataset_config["valid_classes"]
+
+        # Metadata is the same for every image, so build it once for the whole manifest.
+        class_ids = {label: class_id for class_id, label in enumerate(valid_classes)}
+        metadata = {
+            "class-map": {
+                str(class_id): label for class_id, label in enumerate(valid_classes)
+            },
+            "human-annotated": "no",
+            "creation-date": timestamp,
+            "type": "groundtruth/object-detection",
+        }
 
         manifest_entries = []
         s3_objects = [
@@ -108,8 +123,6 @@ class AWSDataset(COVADataset):
                 annotations_file.seek(0)
 
                 annotations = json.load(annotations_file)
-                bucket = self.s3_config["bucket"]
-                images_prefix = self.s3_config["images_prefix"]
                 image_id = Path(filename).stem
                 img_dict: dict[str, Any] = {
                     "source-ref": f"s3://{bucket}/{images_prefix}/{image_id}",
@@ -120,11 +133,10 @@ class AWSDataset(COVADataset):
                 for ann in annotations:
                     ann_dict = {}
 
-                    if float(ann["score"]) < self.dataset_config["min_score"]:
+                    if float(ann["score"]) < min_score:
                         continue
-                    try:
-                        class_id = self.dataset_config["valid_classes"].index(ann["id"])
-                    except ValueError:
+                    class_id = class_ids.get(ann["id"], None)
+                    if class_id is None:
                         continue
 
                     ann_dict["class_id"] = class_id
@@ -138,17 +150,7 @@ class AWSDataset(COVADataset):
 
                     img_dict[dataset_name]["annotations"].append(ann_dict)
 
-                img_dict[f"{dataset_name}-metadata"] = {
-                    "class-map": {
-                        str(class_id): label
-                        for class_id, label in enumerate(
-                            self.dataset_config["valid_classes"]
-                        )
-                    },
-                    "human-annotated": "no",
-                    "creation-date": timestamp,
-                    "type": "groundtruth/object-detection",
-                }
+                img_dict[f"{dataset_name}-metadata"] = metadata
 
                 manifest_entries.append(json.dumps(img_dict))
 
@@ -0,0 +1,77 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+import pandas as pd
+import pytest
+
+from cova.dnn import dataset
+
+
+def test_split_by_filename():
+    df = pd.DataFrame(
+        {
+            "filename": ["b.jpg", "a.jpg", "b.jpg"],
+            "class": ["car", "person", "person"],
+        }
+    )
+
+    groups = dataset._split_by_filename(df)
+
+    assert [group.filename for group in groups] == ["b.jpg", "a.jpg"]
+    assert list(groups[0].object["class"]) == ["car", "person"]
+    assert list(groups[1].object["class"]) == ["person"]
+
+
+def test_encode_classes():
+    classes = pd.Series(["car", "person", "car"], dtype="string")
+
+    classes_text, class_ids = dataset._encode_classes(classes, {"car": 3, "person": 1})
+
+    assert classes_text == [b"car", b"person", b"car"]
+    assert class_ids == [3, 1, 3]
+
+
+def test_encode_classes_missing_class():
+    classes = pd.Series(["car", None], dtype="string")
+
+    with pytest.raises(ValueError):
+        dataset._encode_classes(classes, {"car": 3})
+
+
+def test_encode_classes_unknown_class():
+    classes = pd.Series(["car", "bus"], dtype="string")
+
+    with pytest.raises(KeyError):
+        dataset._encode_classes(classes, {"car": 3})
+
+
+@pytest.mark.parametrize(
+    ("ext", "params"),
+    [
+        [".jpg", []],
+        [".jpg", [cv2.IMWRITE_JPEG_PROGRESSIVE, 1]],
+        [".png", []],
+    ],
+)
+def test_get_image_size(ext, params):
+    img = np.zeros((48, 64, 3), dtype=np.uint8)
+    _, buf = cv2.imencode(ext, img, params)
+
+    assert dataset._get_image_size(buf.tobytes()) == (64, 48)
+
+
+def test_map_bounded():
+    consumed = []
+
+    def items():
+        for i in range(10):
+            consumed.append(i)
+            yield i
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        results = dataset._map_bounded(executor, lambda x: x * x, items(), 3)
+        assert next(results) == 0
+        # One result yielded, at most 3 tasks submitted ahead of the consumer.
+        assert len(consumed) == 4
+        assert list(results) == [i * i for i in range(1, 10)]
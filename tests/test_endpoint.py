@@ -0,0 +1,42 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+requests = pytest.importorskip("requests")
+
+from cova.pipeline.plugins.annotate.endpoint import FlaskAnnotator  # noqa: E402
+
+
+def test_session_per_thread():
+    annotator = FlaskAnnotator("http://localhost")
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        sessions = list(executor.map(lambda _: annotator._get_session(), range(8)))
+
+    assert annotator._get_session() is annotator._get_session()
+    assert len(annotator.sessions) == len({id(s) for s in sessions}) + 1
+
+    annotator.epilogue()
+    assert annotator.sessions == []
+
+
+def test_process_pending_closes_sessions(monkeypatch):
+    annotator = FlaskAnnotator("http://localhost")
+    opened = []
+    closed = []
+    monkeypatch.setattr(requests.Session, "close", lambda self: closed.append(self))
+
+    def post_infer(img):
+        opened.append(annotator._get_session())
+        return 200, []
+
+    monkeypatch.setattr(annotator, "post_infer", post_infer)
+
+    for _ in range(2):
+        for _ in range(4):
+            annotator.annotate(np.zeros((8, 8, 3), dtype=np.uint8))
+        assert len(list(annotator.process_pending(max_workers=2))) == 4
+        assert annotator.sessions == []
+
+    assert {id(s) for s in closed} == {id(s) for s in opened}
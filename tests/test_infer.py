@@ -0,0 +1,85 @@
+from types import SimpleNamespace
+
+import numpy as np
+
+from cova.dnn.infer import ModelIE
+
+
+def test_decode_detection_results():
+    results = np.array(
+        [
+            [
+                [
+                    [0, 1, 0.9, 0.1, 0.2, 0.3, 0.4],
+                    [0, 3, 0.2, 0.5, 0.5, 0.6, 0.6],
+                    [0, 2, 0.5, 0.0, 0.0, 1.0, 1.0],
+                ]
+            ]
+        ],
+        dtype=np.float32,
+    )
+
+    boxes, scores, class_ids = ModelIE.decode_detection_results(results, 0.5)
+
+    np.testing.assert_allclose(boxes, [[0.1, 0.2, 0.3, 0.4], [0.0, 0.0, 1.0, 1.0]])
+    np.testing.assert_allclose(scores, [0.9, 0.5])
+    assert class_ids == [1, 2]
+
+
+def test_decode_rcnn_results():
+    results = {
+        "boxes": np.array(
+            [
+                [10, 20, 30, 40, 0.8],
+                [0, 0, 5, 5, 0.1],
+                [1, 2, 3, 4, 0.7],
+            ],
+            dtype=np.float32,
+        ),
+        "labels": np.array([0, 1, -1], dtype=np.int32),
+    }
+
+    boxes, scores, class_ids = ModelIE.decode_rcnn_results(results, 0.5)
+
+    assert boxes == [[10, 20, 30, 40]]
+    np.testing.assert_allclose(scores, [0.8])
+    assert class_ids == [0]
+
+
+class FakeRequest:
+    def __init__(self, events):
+        self.events = events
+        self.output_blobs = {}
+
+    def wait(self, timeout):
+        self.events.append("wait")
+
+
+class FakeExecNet:
+    def __init__(self, num_requests):
+        self.events = []
+        self.requests = [FakeRequest(self.events) for _ in range(num_requests)]
+
+    def start_async(self, request_id, inputs):
+        self.events.append("start")
+        result = np.zeros((1, 1, 1, 7), dtype=np.float32)
+        self.requests[request_id].output_blobs = {
+            "detection_out": SimpleNamespace(buffer=result)
+        }
+
+
+def test_model_ie_runs_requests_in_parallel():
+    model = ModelIE.__new__(ModelIE)
+    model.net = SimpleNamespace(outputs={"detection_out": None})
+    model.output_blob = "detection_out"
+    model.input_blob = "image"
+    model.net_h, model.net_w = 8, 8
+    model.min_score = 0.5
+    model.label_map = None
+    model.exec_net = FakeExecNet(num_requests=2)
+
+    results = model.run([np.zeros((8, 8, 3), dtype=np.uint8)] * 3)
+
+    assert len(results) == 3
+    # Every request is started before any of them is waited on.
+    assert model.exec_net.events == ["start", "start", "wait", "wait", "start", "wait"]
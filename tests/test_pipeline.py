@@ -0,0 +1,80 @@
+import pytest
+
+from cova.pipeline import pipeline
+from cova.pipeline.pipeline import COVAFactory
+
+PLUGIN = """
+from cova.pipeline import pipeline
+from cova.pipeline.plugins.capture.dummy import DummyCapture
+
+
+class Options(dict):
+    pass
+
+
+class VideoCapture(Exception):
+    pass
+
+
+class MyCapture(DummyCapture):
+    pass
+
+
+class MyFilter(pipeline.COVAFilter):
+    def filter(self, img):
+        return []
+"""
+
+
+@pytest.fixture
+def factory(tmp_path):
+    plugin_file = tmp_path / "my_plugins.py"
+    plugin_file.write_text(PLUGIN)
+    factory = COVAFactory()
+    factory.load_plugins(str(plugin_file))
+    return factory
+
+
+def test_get_indirect_plugin(factory):
+    capture = factory.get("MyCapture", {"stream": ""})
+
+    assert type(capture).__name__ == "MyCapture"
+    assert isinstance(factory.get("MyFilter", {}), pipeline.COVAFilter)
+
+
+def test_get_plugin_by_module(factory):
+    # The DummyCapture imported into the module is not the plugin it implements.
+    assert type(factory.get("my_plugins", {"stream": ""})).__name__ == "MyCapture"
+
+
+def test_get_reuses_loaded_plugin(factory):
+    first = factory.get("DummyCapture", {"stream": ""})
+    second = factory.get("DummyCapture", {"stream": ""})
+
+    assert type(first) is type(second)
+
+
+def test_get_not_a_plugin(factory):
+    with pytest.raises(SystemExit):
+        factory.get("Options", {})
+
+
+def test_helper_class_does_not_shadow_plugin(factory):
+    plugin_file = factory._plugins_by_class["VideoCapture"]
+
+    assert plugin_file.endswith("videocapture.py")
+
+
+def test_load_plugins_subclass_before_base(tmp_path):
+    (tmp_path / "a_child.py").write_text(
+        "from b_parent import Parent\n\n\nclass Child(Parent):\n    pass\n"
+    )
+    (tmp_path / "b_parent.py").write_text(
+        "from cova.pipeline import pipeline\n\n\n"
+        "class Parent(pipeline.COVAFilter):\n    pass\n"
+    )
+    factory = COVAFactory()
+    factory.load_plugins(str(tmp_path))
+
+    assert factory._plugins_by_class["Child"] == str(tmp_path / "a_child.py")
+    assert factory._plugins_by_class["Parent"] == str(tmp_path / "b_parent.py")
@@ -0,0 +1,92 @@
+import sys
+import types
+
+import numpy as np
+import pytest
+
+tf = pytest.importorskip("tensorflow")
+
+from cova.dnn import tools  # noqa: E402
+
+
+class FakeDetectionModel(tf.Module):
+    """Minimal object detection model whose box head follows the global Keras policy.
+
+    As in the Object Detection API Keras models, the head is created on the first call.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.head = None
+        self.anchors = tf.constant([[0.1, 0.1, 0.5, 0.5]], dtype=tf.float32)
+
+    def preprocess(self, inputs):
+        shapes = tf.tile(tf.shape(inputs)[1:][tf.newaxis], [tf.shape(inputs)[0], 1])
+        return inputs / 255.0, shapes
+
+    def predict(self, preprocessed_inputs, true_image_shapes):
+        features = tf.reduce_mean(preprocessed_inputs, axis=[1, 2])
+        if self.head is None:
+            self.head = tf.keras.layers.Dense(4)
+        return {"box_encodings": self.head(features)[:, tf.newaxis]}
+
+    def postprocess(self, prediction_dict, true_image_shapes):
+        # Mixing dtypes here fails, as box decoding does in the Object Detection API.
+        boxes = prediction_dict["box_encodings"] + self.anchors
+        num_boxes = tf.shape(boxes)[0:2]
+        return {
+            "detection_boxes": boxes,
+            "detection_scores": tf.ones(num_boxes),
+            "detection_classes": tf.zeros(num_boxes),
+        }
+
+
+@pytest.fixture
+def model_builder(monkeypatch):
+    builder = types.SimpleNamespace(
+        build=lambda config, is_training: FakeDetectionModel()
+    )
+    config_util = types.SimpleNamespace(
+        get_configs_from_pipeline_file=lambda path: {"model": None}
+    )
+    monkeypatch.setitem(sys.modules, "object_detection", types.ModuleType("od"))
+    monkeypatch.setitem(
+        sys.modules,
+        "object_detection.builders",
+        types.SimpleNamespace(model_builder=builder),
+    )
+    monkeypatch.setitem(
+        sys.modules,
+        "object_detection.utils",
+        types.SimpleNamespace(config_util=config_util),
+    )
+    return builder
+
+
+@pytest.mark.parametrize("mixed_precision", [False, True])
+def test_load_checkpoint_model(tmp_path, model_builder, mixed_precision):
+    model = tools.load_checkpoint_model(
+        str(tmp_path), "pipeline.config", mixed_precision=mixed_precision
+    )
+
+    result = model.detect(np.zeros((2, 8, 8, 3), dtype=np.uint8))
+
+    assert result["detection_boxes"].dtype == np.float32
+    expected_dtype = "float16" if mixed_precision else "float32"
+    assert model.head.compute_dtype == expected_dtype
+    assert result["detection_boxes"].shape == (2, 1, 4)
+    np.testing.assert_array_equal(result["detection_classes"], np.ones((2, 1)))
+    assert tf.keras.mixed_precision.global_policy().name == "float32"
+
+
+def test_load_checkpoint_model_restores_policy(tmp_path, model_builder, monkeypatch):
+    def build(config, is_training):
+        raise RuntimeError
+
+    monkeypatch.setattr(model_builder, "build", build)
+
+    with pytest.raises(RuntimeError):
+        tools.load_checkpoint_model(
+            str(tmp_path), "pipeline.config", mixed_precision=True
+        )
+    assert tf.keras.mixed_precision.global_policy().name == "float32"
@@ -0,0 +1,64 @@
+import cv2
+import numpy as np
+import pytest
+
+from cova.pipeline.plugins.capture.videocapture import VideoCapture
+
+
+@pytest.fixture
+def video(tmp_path):
+    path = str(tmp_path / "video.avi")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"MJPG"), 10, (64, 48))
+    for i in range(10):
+        writer.write(np.full((48, 64, 3), i * 20, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_capture_decode_error(video):
+    cap = VideoCapture(video, resize=(0, 0))
+
+    with pytest.raises(cv2.error):
+        cap.capture()
+    assert cap.capture() == (False, None)
+    cap.epilogue()
+
+
+def test_capture_frameskip(video):
+    cap = VideoCapture(video, frameskip=1)
+
+    frames = []
+    while True:
+        ret, frame = cap.capture()
+        if not ret:
+            break
+        frames.append(int(frame.mean()))
+    cap.epilogue()
+
+    # Frames are 0, 20, 40, ...: every third frame is captured.
+    assert len(frames) == 4
+    np.testing.assert_allclose(frames, [0, 60, 120, 180], atol=2)
+
+
+def test_capture_decode_error_after_frames(video, monkeypatch):
+    resize = cv2.resize
+    calls = []
+
+    def failing_resize(frame, size):
+        calls.append(size)
+        if len(calls) == 4:
+            raise RuntimeError("boom")
+        return resize(frame, size)
+
+    monkeypatch.setattr(cv2, "resize", failing_resize)
+    cap = VideoCapture(video, resize=(32, 24))
+    # Let the decoder hit the error before any frame is captured.
+    cap.decoder.join()
+
+    frames = [cap.capture() for _ in range(3)]
+    with pytest.raises(RuntimeError):
+        cap.capture()
+    assert cap.capture() == (False, None)
+    cap.epilogue()
+
+    assert all(ret and frame.shape == (24, 32, 3) for ret, frame in frames)